@@ -41,6 +41,7 @@ class BleakClientBlueZDBus(BaseBleakClient):
         self._rules = {}
 
         self._char_path_to_uuid = {}
+        self._services_resolved_event = asyncio.Event(loop=self.loop)
 
         # We need to know BlueZ version since battery level characteristic
         # are stored in a separate DBus interface in the BlueZ >= 5.48.
@@ -64,7 +65,13 @@ class BleakClientBlueZDBus(BaseBleakClient):
 
         # A Discover must have been run before connecting to any devices. Do a quick one here
         # to ensure that it has been done.
-        await discover(timeout=kwargs.get('timeout', 0.1), device=self.device, loop=self.loop)
+        # The scan is stopped as soon as the device has been seen.
+        await discover(
+            timeout=kwargs.get('timeout', 0.1),
+            device=self.device,
+            loop=self.loop,
+            address=self.address,
+        )
 
         # Create system bus
         self._bus = await txdbus_connect(reactor, busAddress="system").asFuture(
@@ -73,17 +80,8 @@ class BleakClientBlueZDBus(BaseBleakClient):
         # TODO: Handle path errors from txdbus/dbus
         self._device_path = get_device_object_path(self.device, self.address)
 
-        def _services_resolved_callback(message):
-            iface, changed, invalidated = message.body
-            is_resolved = defs.DEVICE_INTERFACE and changed.get(
-                "ServicesResolved", False
-            )
-            if iface == is_resolved:
-                logger.info("Services resolved.")
-                self.services_resolved = True
-
         rule_id = await signals.listen_properties_changed(
-            self._bus, self.loop, _services_resolved_callback
+            self._bus, self.loop, self._services_resolved_callback
         )
 
         logger.debug(
@@ -167,12 +165,11 @@ class BleakClientBlueZDBus(BaseBleakClient):
         if self._services_resolved:
             return self.services
 
-        while True:
-            properties = await self._get_device_properties()
-            services_resolved = properties.get("ServicesResolved", False)
-            if services_resolved:
-                break
-            await asyncio.sleep(0.02, loop=self.loop)
+        # Wait for the ServicesResolved property to be signalled instead of polling for it.
+        self._services_resolved_event.clear()
+        properties = await self._get_device_properties()
+        if not properties.get("ServicesResolved", False):
+            await self._services_resolved_event.wait()
 
         logger.debug("Get Services...")
         objs = await get_managed_objects(
@@ -183,15 +180,13 @@ class BleakClientBlueZDBus(BaseBleakClient):
         # Managed Objects dict.
         # Need multiple iterations to construct the Service Collection
 
-        _chars, _descs = [], []
+        _services, _chars, _descs = {}, [], []
 
         for object_path, interfaces in objs.items():
             logger.debug(utils.format_GATT_object(object_path, interfaces))
             if defs.GATT_SERVICE_INTERFACE in interfaces:
                 service = interfaces.get(defs.GATT_SERVICE_INTERFACE)
-                self.services.add_service(
-                    BleakGATTServiceBlueZDBus(service, object_path)
-                )
+                _services[object_path] = BleakGATTServiceBlueZDBus(service, object_path)
             elif defs.GATT_CHARACTERISTIC_INTERFACE in interfaces:
                 char = interfaces.get(defs.GATT_CHARACTERISTIC_INTERFACE)
                 _chars.append([char, object_path])
@@ -199,29 +194,23 @@ class BleakClientBlueZDBus(BaseBleakClient):
                 desc = interfaces.get(defs.GATT_DESCRIPTOR_INTERFACE)
                 _descs.append([desc, object_path])
 
+        characteristics = []
         for char, object_path in _chars:
-            _service = list(
-                filter(lambda x: x.path == char["Service"], self.services)
-            )
-            self.services.add_characteristic(
+            characteristics.append(
                 BleakGATTCharacteristicBlueZDBus(
-                    char, object_path, _service[0].uuid
+                    char, object_path, _services[char["Service"]].uuid
                 )
             )
             self._char_path_to_uuid[object_path] = char.get("UUID")
 
-        for desc, object_path in _descs:
-            _characteristic = list(
-                filter(
-                    lambda x: x.path == desc["Characteristic"],
-                    self.services.characteristics.values(),
-                )
-            )
-            self.services.add_descriptor(
-                BleakGATTDescriptorBlueZDBus(
-                    desc, object_path, _characteristic[0].uuid
-                )
+        descriptors = [
+            BleakGATTDescriptorBlueZDBus(
+                desc, object_path, self._char_path_to_uuid[desc["Characteristic"]]
             )
+            for desc, object_path in _descs
+        ]
+
+        self.services.bulk_add(list(_services.values()), characteristics, descriptors)
 
         self._services_resolved = True
         return self.services
@@ -509,6 +498,22 @@ class BleakClientBlueZDBus(BaseBleakClient):
 
     # Internal Callbacks
 
+    def _services_resolved_callback(self, message):
+        """ServicesResolved handler.
+
+        Args:
+            message (): The PropertiesChanged DBus signal message.
+
+        """
+        iface, changed, invalidated = message.body
+        if (
+            iface == defs.DEVICE_INTERFACE
+            and message.path == self._device_path
+            and changed.get("ServicesResolved", False)
+        ):
+            logger.info("Services resolved.")
+            self._services_resolved_event.set()
+
     def _properties_changed_callback(self, message):
         """Notification handler.
 
@@ -521,7 +526,9 @@ class BleakClientBlueZDBus(BaseBleakClient):
                 the new data on the GATT Characteristic.
 
         """
-        if message.body[0] == defs.GATT_CHARACTERISTIC_INTERFACE:
+        if message.body[0] == defs.DEVICE_INTERFACE:
+            self._services_resolved_callback(message)
+        elif message.body[0] == defs.GATT_CHARACTERISTIC_INTERFACE:
             if message.path in self._notification_callbacks:
                 logger.info(
                     "GATT Char Properties Changed: {0} | {1}".format(
@@ -5,7 +5,10 @@ import logging
 
 from bleak.backends.device import BLEDevice
 from bleak.backends.bluezdbus import reactor, defs
-from bleak.backends.bluezdbus.utils import validate_mac_address
+from bleak.backends.bluezdbus.utils import (
+    validate_mac_address,
+    get_device_object_path,
+)
 
 # txdbus.client MUST be imported AFTER bleak.backends.bluezdbus.reactor!
 from txdbus import client
@@ -62,6 +65,8 @@ async def discover(timeout=5.0, loop=None, **kwargs):
 
     Keyword Args:
         device (str): Bluetooth device to use for discovery.
+        address (str): Stop scanning as soon as the device with this address
+            has been found.
 
     Returns:
         List of tuples containing name, address and signal strength
@@ -72,6 +77,9 @@ async def discover(timeout=5.0, loop=None, **kwargs):
     loop = loop if loop else asyncio.get_event_loop()
     cached_devices = {}
     devices = {}
+    address = kwargs.get("address")
+    sought_path = get_device_object_path(device, address) if address else None
+    sought_found = asyncio.Event(loop=loop)
 
     def parse_msg(message):
         if message.member == "InterfacesAdded":
@@ -80,11 +88,9 @@ async def discover(timeout=5.0, loop=None, **kwargs):
                 device_interface = message.body[1].get("org.bluez.Device1", {})
             except Exception as e:
                 raise e
-            devices[msg_path] = (
-                {**devices[msg_path], **device_interface}
-                if msg_path in devices
-                else device_interface
-            )
+            devices.setdefault(msg_path, {}).update(device_interface)
+            if msg_path == sought_path:
+                sought_found.set()
         elif message.member == "PropertiesChanged":
             iface, changed, invalidated = message.body
             if iface != defs.DEVICE_INTERFACE:
@@ -95,11 +101,11 @@ async def discover(timeout=5.0, loop=None, **kwargs):
             # need to get remaining properties from cached_devices. However, we
             # don't want to add all cached_devices to the devices dict since
             # they may not actually be nearby or powered on.
-            if msg_path not in devices and msg_path in cached_devices:
-                devices[msg_path] = cached_devices[msg_path]
-            devices[msg_path] = (
-                {**devices[msg_path], **changed} if msg_path in devices else changed
-            )
+            if msg_path not in devices:
+                devices[msg_path] = dict(cached_devices.get(msg_path, {}))
+            devices[msg_path].update(changed)
+            if msg_path == sought_path:
+                sought_found.set()
         elif message.member == "InterfacesRemoved" and message.body[1][0] == defs.BATTERY_INTERFACE:
             logger.info(
                 "{0}, {1} ({2}): {3}".format(
@@ -169,7 +175,10 @@ async def discover(timeout=5.0, loop=None, **kwargs):
         interface="org.bluez.Adapter1",
         destination="org.bluez",
     ).asFuture(loop)
-    await asyncio.sleep(timeout)
+    try:
+        await asyncio.wait_for(sought_found.wait(), timeout, loop=loop)
+    except asyncio.TimeoutError:
+        pass
     await bus.callRemote(
         adapter_path,
         "StopDiscovery",
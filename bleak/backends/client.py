@@ -7,7 +7,7 @@ Created on 2018-04-23 by hbldh <henrik.blidh@nedomkull.com>
 """
 import abc
 import asyncio
-from typing import Callable, Any
+from typing import Callable, Any, Iterable, List
 
 from bleak.backends.service import BleakGATTServiceCollection
 
@@ -103,6 +103,28 @@ class BaseBleakClient(abc.ABC):
         """
         raise NotImplementedError()
 
+    async def read_gatt_chars(self, uuids: Iterable[str], **kwargs) -> List[bytearray]:
+        """Perform read operations on several GATT characteristics concurrently.
+
+        All reads are issued before any of them is awaited, so that the
+        requests can be pipelined by the Bluetooth stack.
+
+        Args:
+            uuids (list of str or UUID): The uuids of the characteristics to read from.
+
+        Keyword Args:
+            Passed on to :py:meth:`read_gatt_char`.
+
+        Returns:
+            (list of bytearray) The read data, in the same order as ``uuids``.
+
+        """
+        return list(
+            await asyncio.gather(
+                *[self.read_gatt_char(_uuid, **kwargs) for _uuid in uuids]
+            )
+        )
+
     @abc.abstractmethod
     async def read_gatt_descriptor(self, handle: int, **kwargs) -> bytearray:
         """Perform read operation on the specified GATT descriptor.
@@ -42,13 +42,11 @@ class BLEDevice(object):
 
     def __str__(self):
         if self.name == "Unknown":
-            if "manufacturer_data" in self.metadata:
-                ks = list(self.metadata["manufacturer_data"].keys())
-                if len(ks):
-                    mf = MANUFACTURERS.get(ks[0], MANUFACTURERS.get(0xffff))
-                    value = self.metadata["manufacturer_data"].get(
-                        ks[0], MANUFACTURERS.get(0xffff)
-                    )
-                    # TODO: Evaluate how to interpret the value of the company identifier...
-                    return "{0}: {1} ({2})".format(self.address, mf, value)
+            manufacturer_data = self.metadata.get("manufacturer_data")
+            if manufacturer_data:
+                k = next(iter(manufacturer_data))
+                mf = MANUFACTURERS.get(k, MANUFACTURERS.get(0xffff))
+                value = manufacturer_data[k]
+                # TODO: Evaluate how to interpret the value of the company identifier...
+                return "{0}: {1} ({2})".format(self.address, mf, value)
         return "{0}: {1}".format(self.address, self.name)
@@ -47,6 +47,9 @@ class BleakGATTCharacteristicDotNet(BleakGATTCharacteristic):
 
     def __init__(self, obj: GattCharacteristic):
         super().__init__(obj)
+        # Cache UUID strings; every access to them otherwise crosses into .NET.
+        self.__uuid = obj.Uuid.ToString()
+        self.__service_uuid = obj.Service.Uuid.ToString()
         self.__descriptors = [
             # BleakGATTDescriptorDotNet(d, self.uuid) for d in obj.GetAllDescriptors()
         ]
@@ -62,12 +65,12 @@ class BleakGATTCharacteristicDotNet(BleakGATTCharacteristic):
     @property
     def service_uuid(self) -> str:
         """The uuid of the Service containing this characteristic"""
-        return self.obj.Service.Uuid.ToString()
+        return self.__service_uuid
 
     @property
     def uuid(self) -> str:
         """The uuid of this characteristic"""
-        return self.obj.Uuid.ToString()
+        return self.__uuid
 
     @property
     def description(self) -> str:
@@ -7,6 +7,8 @@ Created on 2017-12-05 by hbldh <henrik.blidh@nedomkull.com>
 
 import logging
 import asyncio
+import collections
+import threading
 from asyncio.events import AbstractEventLoop
 from functools import wraps
 from typing import Callable, Any
@@ -18,6 +20,8 @@ from bleak.backends.dotnet.utils import (
     wrap_Task,
     wrap_IAsyncOperation,
     IAsyncOperationAwaitable,
+    IBuffer_to_bytearray,
+    bytes_to_IBuffer,
 )
 from bleak.backends.service import BleakGATTServiceCollection
 from bleak.backends.dotnet.service import BleakGATTServiceDotNet
@@ -30,9 +34,9 @@ from bleak.backends.dotnet.descriptor import BleakGATTDescriptorDotNet
 from BleakBridge import Bridge
 
 # Import of other CLR components needed.
-from System import Array, Byte, UInt64
+from System import UInt64
 from Windows.Foundation import IAsyncOperation, TypedEventHandler
-from Windows.Storage.Streams import DataReader, DataWriter, IBuffer
+from Windows.Storage.Streams import IBuffer
 from Windows.Devices.Bluetooth import (
     BluetoothLEDevice,
     BluetoothConnectionStatus,
@@ -57,6 +61,9 @@ from Windows.Devices.Bluetooth.GenericAttributeProfile import (
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of characteristic/descriptor discovery requests in flight.
+_MAX_CONCURRENT_DISCOVERIES = 4
+
 
 class BleakClientDotNet(BaseBleakClient):
     """The native Windows Bleak Client.
@@ -67,12 +74,18 @@ class BleakClientDotNet(BaseBleakClient):
 
     def __init__(self, address: str, loop: AbstractEventLoop = None, **kwargs):
         super(BleakClientDotNet, self).__init__(address, loop, **kwargs)
+        self._address_upper = address.upper()
 
         # Backend specific. Python.NET objects.
         self._device_info = None
         self._requester = None
         self._bridge = Bridge()
         self._callbacks = {}
+        self._services_changed_handler = None
+        self._services_stale = False
+        # Services whose characteristics have not been discovered yet, keyed on UUID string.
+        self._unresolved_services = collections.OrderedDict()
+        self._discovery_lock = asyncio.Lock(loop=self.loop)
 
         self._address_type = (
             kwargs["address_type"]
@@ -91,19 +104,23 @@ class BleakClientDotNet(BaseBleakClient):
 
         Keyword Args:
             timeout (float): Timeout for required ``discover`` call. Defaults to 2.0.
+            eager (bool): Discover all characteristics and descriptors while connecting. If `False`, they are
+                discovered when they are first needed. Defaults to `True`.
 
         Returns:
             Boolean representing connection status.
 
         """
         # Try to find the desired device.
-        devices = await discover(timeout=kwargs.get('timeout', 2.0), loop=self.loop)
-        sought_device = list(
-            filter(lambda x: x.address.upper() == self.address.upper(), devices)
+        devices = await discover(
+            timeout=kwargs.get('timeout', 2.0), loop=self.loop, address=self._address_upper
+        )
+        sought_device = next(
+            (d for d in devices if d.address == self._address_upper), None
         )
 
-        if len(sought_device):
-            self._device_info = sought_device[0].details
+        if sought_device is not None:
+            self._device_info = sought_device.details
         else:
             raise BleakError(
                 "Device with address {0} was " "not found.".format(self.address)
@@ -131,8 +148,15 @@ class BleakClientDotNet(BaseBleakClient):
 
         self._requester.ConnectionStatusChanged += _ConnectionStatusChanged_Handler
 
+        def _GattServicesChanged_Handler(sender, args):
+            logger.debug("_GattServicesChanged_Handler: {0}".format(self.address))
+            self.loop.call_soon_threadsafe(self._services_changed)
+
+        self._services_changed_handler = _GattServicesChanged_Handler
+        self._requester.GattServicesChanged += self._services_changed_handler
+
         # Obtain services, which also leads to connection being established.
-        services = await self.get_services()
+        await self.get_services(eager=kwargs.get("eager", True))
         connected = False
         if self._services_resolved:
             # If services has been resolved, then we assume that we are connected. This is due to
@@ -162,12 +186,14 @@ class BleakClientDotNet(BaseBleakClient):
 
         """
         logger.debug("Disconnecting from BLE device...")
-        # Remove notifications
-        # TODO: Make sure all notifications are removed prior to Dispose.
-        # Dispose all components that we have requested and created.
-        for service in self.services:
-            service.obj.Dispose()
-        self.services = BleakGATTServiceCollection()
+        # Remove notifications and the services changed handler, then
+        # dispose all components that we have requested and created.
+        self._dispose_services()
+        self._services_resolved = False
+        self._services_stale = False
+        if self._services_changed_handler is not None:
+            self._requester.GattServicesChanged -= self._services_changed_handler
+            self._services_changed_handler = None
         self._requester.Dispose()
         self._requester = None
 
@@ -189,69 +215,250 @@ class BleakClientDotNet(BaseBleakClient):
 
     # GATT services methods
 
-    async def get_services(self) -> BleakGATTServiceCollection:
+    async def get_services(self, eager: bool = True) -> BleakGATTServiceCollection:
         """Get all services registered for this GATT server.
 
+        Args:
+            eager (bool): If `False`, only the services are discovered. The characteristics and descriptors
+                of a service are then discovered when they are first needed. Defaults to `True`.
+
         Returns:
            A :py:class:`bleak.backends.service.BleakGATTServiceCollection` with this device's services tree.
 
         """
-        # Return the Service Collection.
-        if self._services_resolved:
+        # Return the Service Collection, unless the device has reported that its services have changed.
+        # Stale services are kept while notifications are active, since rebuilding would drop them.
+        if self._services_resolved and (not self._services_stale or self._callbacks):
+            if eager and self._unresolved_services:
+                await self._resolve_services(list(self._unresolved_services))
             return self.services
         else:
-            logger.debug("Get Services...")
-            services_result = await wrap_IAsyncOperation(
-                IAsyncOperation[GattDeviceServicesResult](
-                    self._requester.GetGattServicesAsync()
-                ),
-                return_type=GattDeviceServicesResult,
-                loop=self.loop,
+            # Characteristic discovery must not run against a tree that is being replaced,
+            # and concurrent callers must not rebuild it twice.
+            async with self._discovery_lock:
+                if not self._services_resolved or (
+                    self._services_stale and not self._callbacks
+                ):
+                    await self._fetch_services()
+            if eager:
+                await self._resolve_services(list(self._unresolved_services))
+
+            return self.services
+
+    async def _fetch_services(self) -> None:
+        """Fetch the GATT services of the device, replacing a stale services tree if it has changed.
+
+        Must be called with ``self._discovery_lock`` held, and not while notifications are active.
+
+        """
+        logger.debug("Get Services...")
+        # GattServicesChanged is raised once Windows has updated its GATT cache,
+        # so a refetch is served from that cache, as the first fetch is.
+        self._services_stale = False
+        services_result = await wrap_IAsyncOperation(
+            IAsyncOperation[GattDeviceServicesResult](
+                self._requester.GetGattServicesAsync()
+            ),
+            return_type=GattDeviceServicesResult,
+            loop=self.loop,
+        )
+
+        if services_result.Status != GattCommunicationStatus.Success:
+            raise BleakDotNetTaskError("Could not get GATT services.")
+
+        if self._services_resolved:
+            # Windows also raises GattServicesChanged for discoveries made by this client,
+            # so keep the current tree, and the objects handed out from it, if nothing changed.
+            fetched = [
+                (s.Uuid.ToString(), s.AttributeHandle) for s in services_result.Services
+            ]
+            if fetched == [(s.uuid, s.obj.AttributeHandle) for s in self.services]:
+                for service in services_result.Services:
+                    service.Dispose()
+                return
+            self._dispose_services()
+
+        services = [BleakGATTServiceDotNet(s) for s in services_result.Services]
+        self.services.bulk_add(services, [], [])
+        self._unresolved_services = collections.OrderedDict(
+            (s.uuid, s.obj) for s in services
+        )
+        self._services_resolved = True
+
+    def _dispose_services(self) -> None:
+        """Remove the notification handlers and dispose of the current services tree."""
+        for _uuid, callback in self._callbacks.items():
+            characteristic = self.services.get_characteristic(_uuid)
+            if characteristic is not None:
+                self._bridge.RemoveValueChangedCallback(characteristic.obj, callback)
+        self._callbacks.clear()
+        for service in self.services:
+            service.obj.Dispose()
+        self.services = BleakGATTServiceCollection()
+        self._unresolved_services.clear()
+
+    def _services_changed(self) -> None:
+        """Mark the services as stale after a GattServicesChanged event."""
+        self._services_stale = True
+        if self._callbacks:
+            logger.warning(
+                "Services of {0} may have changed. They are rediscovered once all notifications are stopped.".format(
+                    self.address
+                )
             )
 
-            if services_result.Status != GattCommunicationStatus.Success:
-                raise BleakDotNetTaskError("Could not get GATT services.")
+    async def _resolve_services(self, uuids: list) -> None:
+        """Discover characteristics and descriptors of services and add them to the service collection.
 
-            # TODO: Check if fetching yeilds failures...
-            for service in services_result.Services:
-                characteristics_result = await wrap_IAsyncOperation(
-                    IAsyncOperation[GattCharacteristicsResult](
-                        service.GetCharacteristicsAsync()
-                    ),
-                    return_type=GattCharacteristicsResult,
+        Args:
+            uuids: UUID strings of the services to resolve. Already resolved services are skipped.
+
+        """
+        async with self._discovery_lock:
+            pending = [u for u in uuids if u in self._unresolved_services]
+
+            # Characteristics and descriptors are fetched concurrently, but
+            # bounded so that the GATT request queue is not flooded. A service
+            # that fails to resolve stays unresolved without holding back the others.
+            semaphore = asyncio.Semaphore(_MAX_CONCURRENT_DISCOVERIES, loop=self.loop)
+            results = await asyncio.gather(
+                *[
+                    self._get_characteristics(self._unresolved_services[u], semaphore)
+                    for u in pending
+                ],
+                loop=self.loop,
+                return_exceptions=True
+            )
+            errors = [r for r in results if isinstance(r, Exception)]
+            characteristics = [
+                (u, r) for u, r in zip(pending, results) if not isinstance(r, Exception)
+            ]
+            descriptors = iter(
+                await asyncio.gather(
+                    *[
+                        self._get_descriptors(c, semaphore)
+                        for _, service_characteristics in characteristics
+                        for c in service_characteristics
+                    ],
                     loop=self.loop,
+                    return_exceptions=True
                 )
-                self.services.add_service(BleakGATTServiceDotNet(service))
-                if characteristics_result.Status != GattCommunicationStatus.Success:
-                    raise BleakDotNetTaskError(
-                        "Could not get GATT characteristics for {0}.".format(service)
-                    )
-                for characteristic in characteristics_result.Characteristics:
-                    descriptors_result = await wrap_IAsyncOperation(
-                        IAsyncOperation[GattDescriptorsResult](
-                            characteristic.GetDescriptorsAsync()
-                        ),
-                        return_type=GattDescriptorsResult,
-                        loop=self.loop,
-                    )
-                    self.services.add_characteristic(
-                        BleakGATTCharacteristicDotNet(characteristic)
+            )
+
+            resolved, _chars, _descs = [], [], []
+            for u, service_characteristics in characteristics:
+                service_descriptors = [next(descriptors) for _ in service_characteristics]
+                failures = [r for r in service_descriptors if isinstance(r, Exception)]
+                if failures:
+                    errors.extend(failures)
+                    continue
+                for characteristic_obj, descriptor_objs in zip(
+                    service_characteristics, service_descriptors
+                ):
+                    characteristic = BleakGATTCharacteristicDotNet(characteristic_obj)
+                    _chars.append(characteristic)
+                    _descs.extend(
+                        BleakGATTDescriptorDotNet(descriptor, characteristic.uuid)
+                        for descriptor in descriptor_objs
                     )
-                    if descriptors_result.Status != GattCommunicationStatus.Success:
-                        raise BleakDotNetTaskError(
-                            "Could not get GATT descriptors for {0}.".format(
-                                characteristic
-                            )
-                        )
-                    for descriptor in list(descriptors_result.Descriptors):
-                        self.services.add_descriptor(
-                            BleakGATTDescriptorDotNet(
-                                descriptor, characteristic.Uuid.ToString()
-                            )
-                        )
-
-            self._services_resolved = True
-            return self.services
+                resolved.append(u)
+            self.services.bulk_add([], _chars, _descs)
+
+            for u in resolved:
+                self._unresolved_services.pop(u, None)
+            if errors:
+                raise errors[0]
+
+    async def _get_characteristic(self, _uuid) -> BleakGATTCharacteristicDotNet:
+        """Get a characteristic by UUID, discovering unresolved services one by one until it is found."""
+        if self._services_stale:
+            await self.get_services(eager=False)
+        characteristic = self.services.get_characteristic(str(_uuid))
+        error = None
+        for u in list(self._unresolved_services):
+            if characteristic is not None:
+                break
+            try:
+                await self._resolve_services([u])
+            except BleakDotNetTaskError as e:
+                # E.g. a protected service. Keep looking in the others.
+                error = error or e
+                continue
+            characteristic = self.services.get_characteristic(str(_uuid))
+        if characteristic is None and error is not None:
+            raise error
+        return characteristic
+
+    async def _get_descriptor(self, handle: int) -> BleakGATTDescriptorDotNet:
+        """Get a descriptor by handle, discovering all unresolved services if it is not found."""
+        if self._services_stale:
+            await self.get_services(eager=False)
+        descriptor = self.services.get_descriptor(handle)
+        if descriptor is None and self._unresolved_services:
+            try:
+                await self._resolve_services(list(self._unresolved_services))
+            except BleakDotNetTaskError:
+                # The services that did resolve have been added; raise only if they did not help.
+                descriptor = self.services.get_descriptor(handle)
+                if descriptor is None:
+                    raise
+            else:
+                descriptor = self.services.get_descriptor(handle)
+        return descriptor
+
+    async def _get_characteristics(
+        self, service: GattDeviceService, semaphore: asyncio.Semaphore
+    ) -> list:
+        """Fetch the characteristics of a GATT service.
+
+        Args:
+            service: The Managed Windows.Devices.Bluetooth.GenericAttributeProfile.GattDeviceService Object
+            semaphore: Semaphore limiting the number of concurrent GATT requests.
+
+        Returns:
+            List of GattCharacteristic objects.
+
+        """
+        async with semaphore:
+            characteristics_result = await wrap_IAsyncOperation(
+                IAsyncOperation[GattCharacteristicsResult](
+                    service.GetCharacteristicsAsync()
+                ),
+                return_type=GattCharacteristicsResult,
+                loop=self.loop,
+            )
+        if characteristics_result.Status != GattCommunicationStatus.Success:
+            raise BleakDotNetTaskError(
+                "Could not get GATT characteristics for {0}.".format(service)
+            )
+        return list(characteristics_result.Characteristics)
+
+    async def _get_descriptors(
+        self, characteristic: GattCharacteristic, semaphore: asyncio.Semaphore
+    ) -> list:
+        """Fetch the descriptors of a GATT characteristic.
+
+        Args:
+            characteristic: The Managed Windows.Devices.Bluetooth.GenericAttributeProfile.GattCharacteristic Object
+            semaphore: Semaphore limiting the number of concurrent GATT requests.
+
+        Returns:
+            List of GattDescriptor objects.
+
+        """
+        async with semaphore:
+            descriptors_result = await wrap_IAsyncOperation(
+                IAsyncOperation[GattDescriptorsResult](
+                    characteristic.GetDescriptorsAsync()
+                ),
+                return_type=GattDescriptorsResult,
+                loop=self.loop,
+            )
+        if descriptors_result.Status != GattCommunicationStatus.Success:
+            raise BleakDotNetTaskError(
+                "Could not get GATT descriptors for {0}.".format(characteristic)
+            )
+        return list(descriptors_result.Descriptors)
 
     # I/O methods
 
@@ -267,7 +474,7 @@ class BleakClientDotNet(BaseBleakClient):
             (bytearray) The read data.
 
         """
-        characteristic = self.services.get_characteristic(str(_uuid))
+        characteristic = await self._get_characteristic(_uuid)
         if not characteristic:
             raise BleakError("Characteristic {0} was not found!".format(_uuid))
 
@@ -283,10 +490,7 @@ class BleakClientDotNet(BaseBleakClient):
             loop=self.loop,
         )
         if read_result.Status == GattCommunicationStatus.Success:
-            reader = DataReader.FromBuffer(IBuffer(read_result.Value))
-            output = Array.CreateInstance(Byte, reader.UnconsumedBufferLength)
-            reader.ReadBytes(output)
-            value = bytearray(output)
+            value = IBuffer_to_bytearray(IBuffer(read_result.Value))
             logger.debug("Read Characteristic {0} : {1}".format(_uuid, value))
         else:
             raise BleakError(
@@ -310,7 +514,7 @@ class BleakClientDotNet(BaseBleakClient):
             (bytearray) The read data.
 
         """
-        descriptor = self.services.get_descriptor(handle)
+        descriptor = await self._get_descriptor(handle)
         if not descriptor:
             raise BleakError("Descriptor with handle {0} was not found!".format(handle))
 
@@ -326,10 +530,7 @@ class BleakClientDotNet(BaseBleakClient):
             loop=self.loop,
         )
         if read_result.Status == GattCommunicationStatus.Success:
-            reader = DataReader.FromBuffer(IBuffer(read_result.Value))
-            output = Array.CreateInstance(Byte, reader.UnconsumedBufferLength)
-            reader.ReadBytes(output)
-            value = bytearray(output)
+            value = IBuffer_to_bytearray(IBuffer(read_result.Value))
             logger.debug("Read Descriptor {0} : {1}".format(handle, value))
         else:
             raise BleakError(
@@ -351,12 +552,10 @@ class BleakClientDotNet(BaseBleakClient):
             response (bool): If write-with-response operation should be done. Defaults to `False`.
 
         """
-        characteristic = self.services.get_characteristic(str(_uuid))
+        characteristic = await self._get_characteristic(_uuid)
         if not characteristic:
             raise BleakError("Characteristic {0} was not found!".format(_uuid))
 
-        writer = DataWriter()
-        writer.WriteBytes(Array[Byte](data))
         response = (
             GattWriteOption.WriteWithResponse
             if response
@@ -365,7 +564,7 @@ class BleakClientDotNet(BaseBleakClient):
         write_result = await wrap_IAsyncOperation(
             IAsyncOperation[GattWriteResult](
                 characteristic.obj.WriteValueWithResultAsync(
-                    writer.DetachBuffer(), response
+                    bytes_to_IBuffer(data), response
                 )
             ),
             return_type=GattWriteResult,
@@ -388,15 +587,13 @@ class BleakClientDotNet(BaseBleakClient):
             data (bytes or bytearray): The data to send.
 
         """
-        descriptor = self.services.get_descriptor(handle)
+        descriptor = await self._get_descriptor(handle)
         if not descriptor:
             raise BleakError("Descriptor {0} was not found!".format(handle))
 
-        writer = DataWriter()
-        writer.WriteBytes(Array[Byte](data))
         write_result = await wrap_IAsyncOperation(
             IAsyncOperation[GattWriteResult](
-                descriptor.obj.WriteValueAsync(writer.DetachBuffer())
+                descriptor.obj.WriteValueAsync(bytes_to_IBuffer(data))
             ),
             return_type=GattWriteResult,
             loop=self.loop,
@@ -416,7 +613,8 @@ class BleakClientDotNet(BaseBleakClient):
         """Activate notifications/indications on a characteristic.
 
         Callbacks must accept two inputs. The first will be a uuid string
-        object and the second will be a bytearray.
+        object and the second will be a bytearray. Callbacks are run in the
+        client's event loop.
 
         .. code-block:: python
 
@@ -429,7 +627,7 @@ class BleakClientDotNet(BaseBleakClient):
             callback (function): The function to be called on notification.
 
         """
-        characteristic = self.services.get_characteristic(str(_uuid))
+        characteristic = await self._get_characteristic(_uuid)
 
         if self._notification_callbacks.get(str(_uuid)):
             await self.stop_notify(_uuid)
@@ -470,18 +668,19 @@ class BleakClientDotNet(BaseBleakClient):
         else:
             cccd = getattr(GattClientCharacteristicConfigurationDescriptorValue, "None")
 
+        _uuid = characteristic_obj.Uuid.ToString()
         try:
             # TODO: Enable adding multiple handlers!
-            self._callbacks[characteristic_obj.Uuid.ToString()] = TypedEventHandler[
+            self._callbacks[_uuid] = TypedEventHandler[
                 GattCharacteristic, GattValueChangedEventArgs
-            ](_notification_wrapper(callback))
+            ](_notification_wrapper(callback, _uuid, self.loop))
             self._bridge.AddValueChangedCallback(
-                characteristic_obj, self._callbacks[characteristic_obj.Uuid.ToString()]
+                characteristic_obj, self._callbacks[_uuid]
             )
         except Exception as e:
             logger.debug("Start Notify problem: {0}".format(e))
-            if characteristic_obj.Uuid.ToString() in self._callbacks:
-                callback = self._callbacks.pop(characteristic_obj.Uuid.ToString())
+            if _uuid in self._callbacks:
+                callback = self._callbacks.pop(_uuid)
                 self._bridge.RemoveValueChangedCallback(characteristic_obj, callback)
 
             return GattCommunicationStatus.AccessDenied
@@ -498,8 +697,8 @@ class BleakClientDotNet(BaseBleakClient):
 
         if status != GattCommunicationStatus.Success:
             # This usually happens when a device reports that it support indicate, but it actually doesn't.
-            if characteristic_obj.Uuid.ToString() in self._callbacks:
-                callback = self._callbacks.pop(characteristic_obj.Uuid.ToString())
+            if _uuid in self._callbacks:
+                callback = self._callbacks.pop(_uuid)
                 self._bridge.RemoveValueChangedCallback(characteristic_obj, callback)
 
             return GattCommunicationStatus.AccessDenied
@@ -512,7 +711,7 @@ class BleakClientDotNet(BaseBleakClient):
             _uuid: The characteristic to stop notifying/indicating on.
 
         """
-        characteristic = self.services.get_characteristic(str(_uuid))
+        characteristic = await self._get_characteristic(_uuid)
 
         status = await wrap_IAsyncOperation(
             IAsyncOperation[GattCommunicationStatus](
@@ -535,15 +734,33 @@ class BleakClientDotNet(BaseBleakClient):
             self._bridge.RemoveValueChangedCallback(characteristic.obj, callback)
 
 
-def _notification_wrapper(func: Callable):
+def _notification_wrapper(func: Callable, _uuid: str, loop: AbstractEventLoop):
+    # Notifications arrive on a .NET thread. They are decoded there and queued,
+    # and a burst of them is handed to the callback in a single event loop call.
+    pending = collections.deque()
+    lock = threading.Lock()
+
+    def drain():
+        with lock:
+            values = list(pending)
+            pending.clear()
+        for value in values:
+            try:
+                func(_uuid, value)
+            except Exception as e:
+                logger.exception(
+                    "Notification callback for {0} failed: {1}".format(_uuid, e)
+                )
+
     @wraps(func)
     def dotnet_notification_parser(sender: Any, args: Any):
         # Return only the UUID string representation as sender.
-        # Also do a conversion from System.Bytes[] to bytearray.
-        reader = DataReader.FromBuffer(args.CharacteristicValue)
-        output = Array.CreateInstance(Byte, reader.UnconsumedBufferLength)
-        reader.ReadBytes(output)
-
-        return func(sender.Uuid.ToString(), bytearray(output))
+        # Also do a conversion from IBuffer to bytearray.
+        value = IBuffer_to_bytearray(args.CharacteristicValue)
+        with lock:
+            schedule = not pending
+            pending.append(value)
+        if schedule:
+            loop.call_soon_threadsafe(drain)
 
     return dotnet_notification_parser
@@ -17,6 +17,7 @@ class BleakGATTDescriptorDotNet(BleakGATTDescriptor):
         super(BleakGATTDescriptorDotNet, self).__init__(obj)
         self.obj = obj
         self.__characteristic_uuid = characteristic_uuid
+        self.__uuid = obj.Uuid.ToString()
 
     def __str__(self):
         return "{0}: (Handle: {1})".format(self.uuid, self.handle)
@@ -29,7 +30,7 @@ class BleakGATTDescriptorDotNet(BleakGATTDescriptor):
     @property
     def uuid(self) -> str:
         """UUID for this descriptor"""
-        return self.obj.Uuid.ToString()
+        return self.__uuid
 
     @property
     def handle(self) -> int:
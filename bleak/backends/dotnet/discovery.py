@@ -12,13 +12,15 @@ from typing import List
 from asyncio.events import AbstractEventLoop
 
 from bleak.backends.device import BLEDevice
+from bleak.utils import mac_int_2_str
 
 # Import of Bleak CLR->UWP Bridge. It is not needed here, but it enables loading of Windows.Devices
 from BleakBridge import Bridge
 
-from System import Array, Byte
 from Windows.Devices.Bluetooth.Advertisement import BluetoothLEAdvertisementWatcher
-from Windows.Storage.Streams import DataReader, IBuffer
+from Windows.Storage.Streams import IBuffer
+
+from bleak.backends.dotnet.utils import IBuffer_to_bytearray
 
 logger = logging.getLogger(__name__)
 _here = pathlib.Path(__file__).parent
@@ -36,24 +38,25 @@ async def discover(
     Keyword Args:
         string_output (bool): If set to false, ``discover`` returns .NET
             device objects instead.
+        address (str): Stop scanning as soon as the device with this address
+            has been found.
 
     Returns:
         List of strings or objects found.
 
     """
     loop = loop if loop else asyncio.get_event_loop()
+    sought_address = (kwargs.get("address") or "").upper()
+    sought_found = asyncio.Event(loop=loop)
 
     watcher = BluetoothLEAdvertisementWatcher()
 
     devices = {}
 
-    def _format_bdaddr(a):
-        return ":".join("{:02X}".format(x) for x in a.to_bytes(6, byteorder="big"))
-
     def _format_event_args(e):
         try:
             return "{0}: {1}".format(
-                _format_bdaddr(e.BluetoothAddress),
+                mac_int_2_str(e.BluetoothAddress),
                 e.Advertisement.LocalName or "Unknown",
             )
         except Exception:
@@ -64,6 +67,11 @@ async def discover(
             logger.debug("Received {0}.".format(_format_event_args(e)))
             if e.BluetoothAddress not in devices:
                 devices[e.BluetoothAddress] = e
+                if (
+                    sought_address
+                    and mac_int_2_str(e.BluetoothAddress) == sought_address
+                ):
+                    loop.call_soon_threadsafe(sought_found.set)
 
     def AdvertisementWatcher_Stopped(sender, e):
         if sender == watcher:
@@ -78,7 +86,10 @@ async def discover(
 
     # Watcher works outside of the Python process.
     watcher.Start()
-    await asyncio.sleep(timeout, loop=loop)
+    try:
+        await asyncio.wait_for(sought_found.wait(), timeout, loop=loop)
+    except asyncio.TimeoutError:
+        pass
     watcher.Stop()
 
     try:
@@ -89,17 +100,13 @@ async def discover(
 
     found = []
     for d in devices.values():
-        bdaddr = _format_bdaddr(d.BluetoothAddress)
+        bdaddr = mac_int_2_str(d.BluetoothAddress)
         uuids = []
         for u in d.Advertisement.ServiceUuids:
             uuids.append(u.ToString())
         data = {}
         for m in d.Advertisement.ManufacturerData:
-            md = IBuffer(m.Data)
-            b = Array.CreateInstance(Byte, md.Length)
-            reader = DataReader.FromBuffer(md)
-            reader.ReadBytes(b)
-            data[m.CompanyId] = bytes(b)
+            data[m.CompanyId] = bytes(IBuffer_to_bytearray(IBuffer(m.Data)))
         found.append(BLEDevice(bdaddr, d.Advertisement.LocalName, d, uuids=uuids, manufacturer_data=data))
 
     return found
@@ -11,13 +11,14 @@ class BleakGATTServiceDotNet(BleakGATTService):
 
     def __init__(self, obj: GattDeviceService):
         super().__init__(obj)
+        self.__uuid = obj.Uuid.ToString()
         self.__characteristics = [
             # BleakGATTCharacteristicDotNet(c) for c in obj.GetAllCharacteristics()
         ]
 
     @property
     def uuid(self):
-        return self.obj.Uuid.ToString()
+        return self.__uuid
 
     @property
     def characteristics(self) -> List[BleakGATTCharacteristicDotNet]:
@@ -6,22 +6,31 @@ Created on 2017-12-05 by hbldh <henrik.blidh@nedomkull.com>
 """
 
 import asyncio
+import ctypes
 from collections import Awaitable
 
 from bleak.exc import BleakDotNetTaskError
 
 # Pythonf for .NET CLR imports
-from System import Action
+from System import Action, Array, Byte, Int64, IntPtr
+from System.Runtime.InteropServices import Marshal
 from System.Threading.Tasks import Task
 from Windows.Foundation import (
     AsyncOperationCompletedHandler,
     IAsyncOperation,
     AsyncStatus,
 )
+from Windows.Storage.Streams import DataReader, DataWriter
+
+
+def _set_done(future):
+    # The awaiting coroutine may have been cancelled before the .NET callback ran.
+    if not future.done():
+        future.set_result(None)
 
 
 async def wrap_Task(task, loop):
-    """Enables await on .NET Task using asyncio.Event and a lambda callback.
+    """Enables await on .NET Task using an asyncio.Future and a lambda callback.
 
     Args:
         task (System.Threading.Tasks.Task): .NET async task object
@@ -32,11 +41,13 @@ async def wrap_Task(task, loop):
         The results of the the .NET Task.
 
     """
-    done = asyncio.Event()
-    # Register Action<Task> callback that triggers the above asyncio.Event.
-    task.ContinueWith(Action[Task]())
+    done = loop.create_future()
+    # Register Action<Task> callback that resolves the above future.
+    task.ContinueWith(
+        Action[Task](lambda x: loop.call_soon_threadsafe(_set_done, done))
+    )
     # Wait for callback.
-    await done.wait()
+    await done
     # TODO: Handle IsCancelled.
     if task.IsFaulted:
         # Exception occurred. Wrap it in BleakDotNetTaskError
@@ -47,7 +58,7 @@ async def wrap_Task(task, loop):
 
 
 async def wrap_IAsyncOperation(op, return_type, loop):
-    """Enables await on .NET Task using asyncio.Event and a lambda callback.
+    """Enables await on .NET Task using an asyncio.Future and a lambda callback.
 
     Args:
         task (System.Threading.Tasks.Task): .NET async task object to await.
@@ -57,13 +68,13 @@ async def wrap_IAsyncOperation(op, return_type, loop):
         The results of the the .NET Task.
 
     """
-    done = asyncio.Event()
-    # Register AsyncOperationCompletedHandler callback that triggers the above asyncio.Event.
+    done = loop.create_future()
+    # Register AsyncOperationCompletedHandler callback that resolves the above future.
     op.Completed = AsyncOperationCompletedHandler[return_type](
-        lambda x, y: loop.call_soon_threadsafe(done.set)
+        lambda x, y: loop.call_soon_threadsafe(_set_done, done)
     )
     # Wait for callback.
-    await done.wait()
+    await done
 
     if op.Status == AsyncStatus.Completed:
         return op.GetResults()
@@ -76,6 +87,59 @@ async def wrap_IAsyncOperation(op, return_type, loop):
         raise BleakDotNetTaskError("IAsyncOperation Status: {0}".format(op.Status))
 
 
+def IBuffer_to_bytearray(buffer):
+    """Copy the contents of a .NET IBuffer into a bytearray.
+
+    The data is copied straight into the memory of the returned bytearray with
+    ``Marshal.Copy``, instead of iterating over a ``System.Byte[]`` from Python.
+
+    Args:
+        buffer (Windows.Storage.Streams.IBuffer): The buffer to read.
+
+    Returns:
+        (bytearray) The buffer contents.
+
+    """
+    reader = DataReader.FromBuffer(buffer)
+    length = reader.UnconsumedBufferLength
+    output = Array.CreateInstance(Byte, length)
+    reader.ReadBytes(output)
+
+    value = bytearray(length)
+    if length:
+        c_buffer = (ctypes.c_char * length).from_buffer(value)
+        Marshal.Copy(
+            output, 0, IntPtr.__overloads__[Int64](ctypes.addressof(c_buffer)), length
+        )
+        del c_buffer
+    return value
+
+
+def bytes_to_IBuffer(data):
+    """Copy bytes-like data into a new .NET IBuffer.
+
+    The data is copied straight from Python memory into a ``System.Byte[]``
+    with ``Marshal.Copy``, instead of converting it element by element.
+
+    Args:
+        data (bytes or bytearray): The data to copy.
+
+    Returns:
+        (Windows.Storage.Streams.IBuffer) A buffer with the data.
+
+    """
+    data = bytes(data)
+    length = len(data)
+    output = Array.CreateInstance(Byte, length)
+    if length:
+        address = ctypes.cast(ctypes.c_char_p(data), ctypes.c_void_p).value
+        Marshal.Copy(IntPtr.__overloads__[Int64](address), output, 0, length)
+
+    writer = DataWriter()
+    writer.WriteBytes(output)
+    return writer.DetachBuffer()
+
+
 class TaskWrapper(Awaitable):
     """An awaitable wrapper class for .NET Tasks."""
 
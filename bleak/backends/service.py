@@ -6,7 +6,7 @@ Created on 2019-03-19 by hbldh <henrik.blidh@nedomkull.com>
 
 """
 import abc
-from typing import List, Union, Iterator
+from typing import Iterable, List, Union, Iterator
 
 from bleak import BleakError
 from bleak.uuids import uuidstr_to_str
@@ -142,3 +142,70 @@ class BleakGATTServiceCollection(object):
     def get_descriptor(self, handle: int) -> BleakGATTDescriptor:
         """Get a descriptor by integer handle"""
         return self.descriptors.get(handle, None)
+
+    def bulk_add(
+        self,
+        services: Iterable[BleakGATTService],
+        characteristics: Iterable[BleakGATTCharacteristic],
+        descriptors: Iterable[BleakGATTDescriptor],
+    ):
+        """Add services, characteristics and descriptors to the service collection.
+
+        Does the same as :py:meth:`add_service`, :py:meth:`add_characteristic`
+        and :py:meth:`add_descriptor`, but builds each mapping in one pass. Nothing
+        is added if any of the items is already present, or if the service or
+        characteristic it belongs to is missing.
+
+        Should not be used by end user, but rather by `bleak` itself.
+        """
+        services = list(services)
+        characteristics = list(characteristics)
+        descriptors = list(descriptors)
+        new_services = {s.uuid: s for s in services}
+        new_characteristics = {c.uuid: c for c in characteristics}
+        new_descriptors = {d.handle: d for d in descriptors}
+
+        for kind, items, new, present in (
+            ("service", services, new_services, self.__services),
+            ("characteristic", characteristics, new_characteristics, self.__characteristics),
+            ("descriptor", descriptors, new_descriptors, self.__descriptors),
+        ):
+            if len(new) != len(items) or not present.keys().isdisjoint(new):
+                raise BleakError(
+                    "This {0} is already present in this BleakGATTServiceCollection!".format(
+                        kind
+                    )
+                )
+
+        for characteristic in characteristics:
+            if (
+                characteristic.service_uuid not in self.__services
+                and characteristic.service_uuid not in new_services
+            ):
+                raise BleakError(
+                    "Service {0} of characteristic {1} is not present in this BleakGATTServiceCollection!".format(
+                        characteristic.service_uuid, characteristic.uuid
+                    )
+                )
+        for descriptor in descriptors:
+            if (
+                descriptor.characteristic_uuid not in self.__characteristics
+                and descriptor.characteristic_uuid not in new_characteristics
+            ):
+                raise BleakError(
+                    "Characteristic {0} of descriptor {1} is not present in this BleakGATTServiceCollection!".format(
+                        descriptor.characteristic_uuid, descriptor.handle
+                    )
+                )
+
+        self.__services.update(new_services)
+        self.__characteristics.update(new_characteristics)
+        self.__descriptors.update(new_descriptors)
+        for characteristic in characteristics:
+            self.__services[characteristic.service_uuid].add_characteristic(
+                characteristic
+            )
+        for descriptor in descriptors:
+            self.__characteristics[descriptor.characteristic_uuid].add_descriptor(
+                descriptor
+            )
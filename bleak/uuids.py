@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from functools import lru_cache
 
 uuid16_dict = {
     0x0001: "SDP",
@@ -653,6 +654,7 @@ uuid128_dict = {
 }
 
 
+@lru_cache(maxsize=256)
 def uuidstr_to_str(uuid_):
     s = uuid128_dict.get(uuid_)
     if s:
@@ -660,9 +662,14 @@ def uuidstr_to_str(uuid_):
 
     if not s and uuid_.endswith("-0000-1000-8000-00805f9b34fb"):
         s = "Vendor specific"
-    v = int(uuid_[:8], 16)
-    if (v & 0xffff0000) == 0x0000:
-        s = uuid16_dict.get(v & 0x0000ffff, s)
+    if len(uuid_) == 36:
+        if uuid_.startswith("0000"):
+            s = uuid16_dict.get(int(uuid_[4:8], 16), s)
+    else:
+        # Short form, e.g. "180a".
+        v = int(uuid_[:8], 16)
+        if (v & 0xffff0000) == 0x0000:
+            s = uuid16_dict.get(v & 0x0000ffff, s)
     if not s:
         return "Unknown"
 
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `bleak.backends.client` module."""
+
+import asyncio
+import sys
+
+import pytest
+
+try:
+    from bleak.exc import BleakError
+    from bleak.backends.client import BaseBleakClient
+except (
+    ImportError,
+    OSError,
+    # bleak.exc is loaded before bleak checks the platform's Bluetooth stack.
+    getattr(sys.modules.get("bleak.exc"), "BleakError", ImportError),
+) as e:
+    # Importing bleak requires the platform's Bluetooth stack to be present.
+    pytest.skip("Could not import bleak: {0}".format(e), allow_module_level=True)
+
+
+class _Client(BaseBleakClient):
+    """In-memory client whose reads finish in the reverse order of their delays."""
+
+    def __init__(self, values, loop):
+        super(_Client, self).__init__("00:00:00:00:00:00", loop=loop)
+        self.values = values
+        self.completed = []
+
+    async def connect(self, **kwargs):
+        return True
+
+    async def disconnect(self):
+        return True
+
+    async def is_connected(self):
+        return True
+
+    async def get_services(self):
+        return self.services
+
+    async def read_gatt_char(self, _uuid, **kwargs):
+        delay, value = self.values[_uuid]
+        await asyncio.sleep(delay)
+        if isinstance(value, Exception):
+            raise value
+        self.completed.append(_uuid)
+        return value
+
+    async def read_gatt_descriptor(self, handle, **kwargs):
+        raise NotImplementedError()
+
+    async def write_gatt_char(self, _uuid, data, response=False):
+        raise NotImplementedError()
+
+    async def write_gatt_descriptor(self, handle, data):
+        raise NotImplementedError()
+
+    async def start_notify(self, _uuid, callback, **kwargs):
+        raise NotImplementedError()
+
+    async def stop_notify(self, _uuid):
+        raise NotImplementedError()
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_read_gatt_chars_order(loop):
+    """Test that read_gatt_chars returns the results in the order of the uuids."""
+    client = _Client(
+        {
+            "a": (0.03, bytearray(b"\x01")),
+            "b": (0.0, bytearray(b"\x02")),
+            "c": (0.01, bytearray(b"\x03")),
+        },
+        loop,
+    )
+    result = loop.run_until_complete(client.read_gatt_chars(["a", "b", "c"]))
+    assert result == [bytearray(b"\x01"), bytearray(b"\x02"), bytearray(b"\x03")]
+    assert client.completed == ["b", "c", "a"]
+
+
+def test_read_gatt_chars_error(loop):
+    """Test that a failing read makes read_gatt_chars raise."""
+    client = _Client(
+        {"a": (0.0, bytearray(b"\x01")), "b": (0.01, BleakError("Read failed"))},
+        loop,
+    )
+    with pytest.raises(BleakError):
+        loop.run_until_complete(client.read_gatt_chars(["a", "b"]))
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `bleak.backends.service` module."""
+
+import sys
+
+import pytest
+
+try:
+    from bleak.exc import BleakError
+    from bleak.backends.service import BleakGATTService, BleakGATTServiceCollection
+    from bleak.backends.characteristic import BleakGATTCharacteristic
+    from bleak.backends.descriptor import BleakGATTDescriptor
+except (
+    ImportError,
+    OSError,
+    # bleak.exc is loaded before bleak checks the platform's Bluetooth stack.
+    getattr(sys.modules.get("bleak.exc"), "BleakError", ImportError),
+) as e:
+    # Importing bleak requires the platform's Bluetooth stack to be present.
+    pytest.skip("Could not import bleak: {0}".format(e), allow_module_level=True)
+
+
+class _Service(BleakGATTService):
+    def __init__(self, uuid):
+        super(_Service, self).__init__(None)
+        self._uuid = uuid
+        self._characteristics = []
+
+    @property
+    def uuid(self):
+        return self._uuid
+
+    @property
+    def characteristics(self):
+        return self._characteristics
+
+    def add_characteristic(self, characteristic):
+        self._characteristics.append(characteristic)
+
+    def get_characteristic(self, _uuid):
+        return next((c for c in self._characteristics if c.uuid == _uuid), None)
+
+
+class _Characteristic(BleakGATTCharacteristic):
+    def __init__(self, uuid, service_uuid):
+        super(_Characteristic, self).__init__(None)
+        self._uuid = uuid
+        self._service_uuid = service_uuid
+        self._descriptors = []
+
+    @property
+    def service_uuid(self):
+        return self._service_uuid
+
+    @property
+    def uuid(self):
+        return self._uuid
+
+    @property
+    def description(self):
+        return ""
+
+    @property
+    def properties(self):
+        return []
+
+    @property
+    def descriptors(self):
+        return self._descriptors
+
+    def get_descriptor(self, _uuid):
+        return next((d for d in self._descriptors if d.uuid == _uuid), None)
+
+    def add_descriptor(self, descriptor):
+        self._descriptors.append(descriptor)
+
+
+class _Descriptor(BleakGATTDescriptor):
+    def __init__(self, handle, characteristic_uuid):
+        super(_Descriptor, self).__init__(None)
+        self._handle = handle
+        self._characteristic_uuid = characteristic_uuid
+
+    @property
+    def characteristic_uuid(self):
+        return self._characteristic_uuid
+
+    @property
+    def uuid(self):
+        return "00002902-0000-1000-8000-00805f9b34fb"
+
+    @property
+    def handle(self):
+        return self._handle
+
+
+def test_bulk_add():
+    """Test that bulk_add links the added items to their parents."""
+    collection = BleakGATTServiceCollection()
+    collection.bulk_add(
+        [_Service("s1")],
+        [_Characteristic("c1", "s1"), _Characteristic("c2", "s1")],
+        [_Descriptor(1, "c1")],
+    )
+    assert list(collection.services) == ["s1"]
+    assert [c.uuid for c in collection.get_service("s1").characteristics] == [
+        "c1",
+        "c2",
+    ]
+    assert collection.get_descriptor(1) in collection.get_characteristic(
+        "c1"
+    ).descriptors
+
+    # Parents may already be present in the collection.
+    collection.bulk_add([], [_Characteristic("c3", "s1")], [_Descriptor(2, "c3")])
+    assert collection.get_descriptor(2).characteristic_uuid == "c3"
+
+
+@pytest.mark.parametrize(
+    "services,characteristics,descriptors",
+    [
+        ([_Service("s1")], [], []),
+        ([_Service("s2"), _Service("s2")], [], []),
+        ([], [_Characteristic("c1", "s1")], []),
+        ([], [], [_Descriptor(1, "c1")]),
+    ],
+)
+def test_bulk_add_duplicates(services, characteristics, descriptors):
+    """Test that bulk_add refuses items that are already present."""
+    collection = BleakGATTServiceCollection()
+    collection.bulk_add(
+        [_Service("s1")], [_Characteristic("c1", "s1")], [_Descriptor(1, "c1")]
+    )
+    with pytest.raises(BleakError):
+        collection.bulk_add(services, characteristics, descriptors)
+    assert list(collection.services) == ["s1"]
+    assert list(collection.characteristics) == ["c1"]
+    assert list(collection.descriptors) == [1]
+
+
+@pytest.mark.parametrize(
+    "characteristics,descriptors",
+    [
+        ([_Characteristic("c2", "zz")], []),
+        ([], [_Descriptor(2, "zz")]),
+        ([_Characteristic("c2", "s1")], [_Descriptor(2, "zz")]),
+    ],
+)
+def test_bulk_add_orphans(characteristics, descriptors):
+    """Test that bulk_add refuses items whose parent is missing, without changing anything."""
+    collection = BleakGATTServiceCollection()
+    collection.bulk_add([_Service("s1")], [], [])
+    with pytest.raises(BleakError):
+        collection.bulk_add([], characteristics, descriptors)
+    assert list(collection.characteristics) == []
+    assert list(collection.descriptors) == []
+    assert collection.get_service("s1").characteristics == []
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `bleak.uuids` module."""
+
+import sys
+
+import pytest
+
+try:
+    from bleak.uuids import uuidstr_to_str
+except (
+    ImportError,
+    OSError,
+    # bleak.exc is loaded before bleak checks the platform's Bluetooth stack.
+    getattr(sys.modules.get("bleak.exc"), "BleakError", ImportError),
+) as e:
+    # Importing bleak requires the platform's Bluetooth stack to be present.
+    pytest.skip("Could not import bleak: {0}".format(e), allow_module_level=True)
+
+
+@pytest.mark.parametrize(
+    "uuid_,description",
+    [
+        ("0000180a-0000-1000-8000-00805f9b34fb", "Device Information"),
+        ("00002a19-0000-1000-8000-00805f9b34fb", "Battery Level"),
+        ("180a", "Device Information"),
+        ("2a19", "Battery Level"),
+        ("0000180a", "Device Information"),
+        ("12345678-1234-5678-1234-56789abcdef0", "Unknown"),
+    ],
+)
+def test_uuidstr_to_str(uuid_, description):
+    """Test that both full and short form UUIDs are described."""
+    assert uuidstr_to_str(uuid_) == description